@@ -0,0 +1,82 @@
+import hashlib
+import os
+import threading
+import time
+
+class CandleSeries:
+    """
+    One fetched candle series plus everything derived from it
+
+    Attributes:
+        data: Parsed Coinbase response ({"candles": [...]})
+        version: Short hash of the upstream body; changes only when the candles change
+        last_modified: Unix time this version was first seen
+        fetched_at: Unix time of the last upstream fetch
+    """
+
+    def __init__(self, data, version, last_modified, fetched_at):
+        self.data = data
+        self.version = version
+        self.last_modified = last_modified
+        self.fetched_at = fetched_at
+        # Serialized (and compressed) bodies keyed by (format, encoding), built once per version
+        self.bodies = {}
+
+    def etag(self, fmt):
+        """ETag value for one representation of this series"""
+        return f"{self.version}-{fmt}"
+
+class CandleStore:
+    """
+    Small in-process cache of candle series keyed by (ticker, granularity, days_back)
+
+    Entries are served for `ttl` seconds before Coinbase is asked again. A refetch that
+    returns identical candles keeps the previous version, so clients revalidating with
+    If-None-Match still get a 304.
+    """
+
+    def __init__(self, ttl, max_entries=256):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """Return the cached series if it is still fresh, otherwise None"""
+        if self.ttl <= 0:
+            return None
+        with self._lock:
+            series = self._series.get(key)
+        if series is None or time.time() - series.fetched_at > self.ttl:
+            return None
+        return series
+
+    def put(self, key, body, data):
+        """
+        Store a freshly fetched series
+
+        Args:
+            key: (ticker, granularity, days_back)
+            body: Raw upstream response bytes, used to version the series
+            data: Parsed upstream JSON
+
+        Returns:
+            CandleSeries
+        """
+        now = time.time()
+        version = hashlib.sha1(body).hexdigest()[:16]
+        with self._lock:
+            previous = self._series.pop(key, None)
+            if previous is not None and previous.version == version:
+                previous.fetched_at = now
+                series = previous
+            else:
+                series = CandleSeries(data, version, now, now)
+            self._series[key] = series
+            # Dicts keep insertion order, so the first key is the least recently fetched
+            while len(self._series) > self.max_entries:
+                self._series.pop(next(iter(self._series)))
+        return series
+
+# Shared store for the historical prices endpoint (CANDLE_CACHE_TTL=0 disables caching)
+candle_store = CandleStore(ttl=float(os.getenv('CANDLE_CACHE_TTL', 5)))
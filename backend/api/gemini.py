@@ -1,57 +1,17 @@
 from flask import Blueprint, request, jsonify
-import google.generativeai as genai
 import os
 import json
+import logging
+from api.observability import stage, record_internal_error, log_payload
+from api.llm import LLMError, generate, get_model
+from api.portfolio_history import performance_summary, DEFAULT_USER_ID
 
 gemini_bp = Blueprint('gemini', __name__)
 
-def get_text(response):
-    """Safely extract text from Gemini API response."""
-    if hasattr(response, "text") and response.text:
-        return response.text.strip()
-    try:
-        return response.candidates[0].content.parts[0].text.strip()
-    except Exception as e:
-        print(f"[Gemini] Could not extract text: {e}")
-        return ""
-
-@gemini_bp.route('', methods=['POST'])
-def generate_response():
-    data = request.get_json()
-    prompt = data.get('prompt')
-    portfolio = data.get('portfolio', [])  # Get portfolio data if provided
-    api_key = os.getenv('GEMINI_API_KEY')
-
-    if not api_key:
-        return jsonify({'error': 'Gemini API key not set'}), 500
+logger = logging.getLogger(__name__)
 
-    if not prompt:
-        return jsonify({'error': 'Prompt is required'}), 400
-
-    # Build portfolio context string
-    portfolio_context = ""
-    if portfolio and len(portfolio) > 0:
-        portfolio_context = "\n\n**USER'S CURRENT PORTFOLIO:**\n"
-        total_value = 0
-        for holding in portfolio:
-            ticker = holding.get('ticker', 'UNKNOWN')
-            quantity = holding.get('quantity', 0)
-            value = holding.get('totalValue', 0)
-            total_value += value
-            
-            if ticker == 'CASH':
-                portfolio_context += f"- CASH: ${quantity:.2f}\n"
-            else:
-                portfolio_context += f"- {ticker}: {quantity} units (${value:.2f})\n"
-        
-        portfolio_context += f"\n**TOTAL PORTFOLIO VALUE: ${total_value:.2f}**\n"
-        portfolio_context += "\n**CONTEXT INSTRUCTIONS:**\n"
-        portfolio_context += "- When the user asks about their portfolio, reference these specific holdings.\n"
-        portfolio_context += "- If recommending buys, consider their available CASH balance.\n"
-        portfolio_context += "- If recommending sells, only suggest coins they actually own.\n"
-        portfolio_context += "- Provide personalized advice based on their current positions.\n"
-
-    combined_prompt = f"""
+# Chat prompt, filled in per request with str.format (literal braces are doubled)
+CHAT_PROMPT_TEMPLATE = """
 You are Coinpilot, a serious, sharp-tongued AI that lives and breathes cryptocurrency.
 Your primary function is to **parse the user's request for transaction plans or recommendations** and provide a brief **analysis**.
 {portfolio_context}
@@ -151,13 +111,76 @@ User's message: {prompt}
 }}
 """
 
+def get_text(response):
+    """Safely extract text from Gemini API response."""
+    if hasattr(response, "text") and response.text:
+        return response.text.strip()
+    try:
+        return response.candidates[0].content.parts[0].text.strip()
+    except Exception as e:
+        logger.warning("Could not extract text from Gemini response: %s", e)
+        return ""
+
+@gemini_bp.route('', methods=['POST'])
+def generate_response():
+    data = request.get_json()
+    prompt = data.get('prompt')
+    portfolio = data.get('portfolio', [])  # Get portfolio data if provided
+    user_id = data.get('user_id') or DEFAULT_USER_ID
+    api_key = os.getenv('GEMINI_API_KEY')
+
+    if not api_key:
+        return jsonify({'error': 'Gemini API key not set'}), 500
+
+    if not prompt:
+        return jsonify({'error': 'Prompt is required'}), 400
+
+    if not isinstance(user_id, str):
+        return jsonify({'error': 'user_id must be a string'}), 400
+
+    # Build portfolio context string
+    portfolio_context = ""
+    if portfolio and len(portfolio) > 0:
+        portfolio_context = "\n\n**USER'S CURRENT PORTFOLIO:**\n"
+        total_value = 0
+        for holding in portfolio:
+            ticker = holding.get('ticker', 'UNKNOWN')
+            quantity = holding.get('quantity', 0)
+            value = holding.get('totalValue', 0)
+            total_value += value
+            
+            if ticker == 'CASH':
+                portfolio_context += f"- CASH: ${quantity:.2f}\n"
+            else:
+                portfolio_context += f"- {ticker}: {quantity} units (${value:.2f})\n"
+        
+        portfolio_context += f"\n**TOTAL PORTFOLIO VALUE: ${total_value:.2f}**\n"
+        portfolio_context += "\n**CONTEXT INSTRUCTIONS:**\n"
+        portfolio_context += "- When the user asks about their portfolio, reference these specific holdings.\n"
+        portfolio_context += "- If recommending buys, consider their available CASH balance.\n"
+        portfolio_context += "- If recommending sells, only suggest coins they actually own.\n"
+        portfolio_context += "- Provide personalized advice based on their current positions.\n"
+
+    # Recorded portfolio value history, so "how has my portfolio done" has real numbers
+    # History is optional context, so a store or read failure just leaves it out
+    try:
+        history = performance_summary(user_id)
+    except Exception as e:
+        logger.warning("Could not load portfolio history for %s: %s", user_id, e)
+        history = ""
+    if history:
+        portfolio_context += "\n**PORTFOLIO VALUE HISTORY:**\n" + history
+        portfolio_context += "- When the user asks how their portfolio has performed, use these numbers.\n"
+
+    combined_prompt = CHAT_PROMPT_TEMPLATE.format(portfolio_context=portfolio_context, prompt=prompt)
+
     try:
-        genai.configure(api_key=api_key)
-        model = genai.GenerativeModel('gemini-2.5-flash')
+        model = get_model(api_key)
 
-        result = model.generate_content(combined_prompt)
+        with stage('llm_call'):
+            result = generate(model, combined_prompt)
         response_text = get_text(result)
-        print(f"[Gemini Debug] Raw combined response:\n{response_text}\n")
+        log_payload(logger, 'gemini.raw_response', response=response_text)
 
         try:
             # Clean up possible markdown formatting
@@ -171,7 +194,8 @@ User's message: {prompt}
             clean_text = clean_text.replace(""", '"').replace(""", '"').replace("'", "'").replace("'", "'").strip()
             
             # Load the final data
-            final_data = json.loads(clean_text)
+            with stage('json_parse'):
+                final_data = json.loads(clean_text)
 
             # Check for the required keys and structure
             if 'research' in final_data and 'is_plan' in final_data:
@@ -192,17 +216,22 @@ User's message: {prompt}
                 raise KeyError("Missing 'research' or 'is_plan' in the final JSON output.")
 
         except (json.JSONDecodeError, KeyError) as e:
-            print(f"[Gemini JSON error] {e}")
+            logger.warning("Gemini returned unparseable JSON, using fallback: %s", e)
             fallback_prompt = f"""
             You are Coinpilot, a sarcastic AI. Give a witty, 3-sentence response to the user's message (do not use big words): "{prompt}"
             """
-            fallback_result = model.generate_content(fallback_prompt)
+            with stage('fallback_call'):
+                fallback_result = generate(model, fallback_prompt)
             fallback_text = get_text(fallback_result)
             return jsonify({
                 'research': f"Error parsing structured response. Coinpilot says: {fallback_text}",
                 'is_plan': False
             })
 
+    except LLMError as err:
+        logger.error("Gemini API error: %s", err)
+        return jsonify({'error': 'Failed to fetch from Gemini API'}), 500
     except Exception as err:
-        print(f"[Gemini API Error] {err}")
+        record_internal_error(type(err).__name__)
+        logger.exception("Chat request failed")
         return jsonify({'error': 'Failed to fetch from Gemini API'}), 500
\ No newline at end of file
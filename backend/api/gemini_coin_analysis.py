@@ -1,25 +1,16 @@
 from flask import Blueprint, request, jsonify
-import google.generativeai as genai
 import os
 import json
+import logging
+from api.observability import stage, record_internal_error, log_payload
+from api.llm import LLMError, generate, get_model
 
 coin_analysis_bp = Blueprint('coin_analysis', __name__)
 
-@coin_analysis_bp.route('', methods=['POST'])
-def analyze_coin():
-    data = request.get_json()
-    crypto = data.get('crypto')
-    action = data.get('action') 
-    amount = data.get('amount')
-    api_key = os.getenv('GEMINI_API_KEY')
+logger = logging.getLogger(__name__)
 
-    if not api_key:
-        return jsonify({'error': 'Gemini API key not set'}), 500
-    
-    if not crypto:
-        return jsonify({'error': 'Crypto symbol is required'}), 400
-
-    analysis_prompt = f"""
+# Analysis prompt, filled in per request with str.format (literal braces are doubled)
+ANALYSIS_PROMPT_TEMPLATE = """
     You are a cryptocurrency market analyst. Analyze {crypto} for a potential {action} decision.
 
     Provide a detailed analysis in JSON format with the following structure:
@@ -56,14 +47,30 @@ def analyze_coin():
     Respond with ONLY the JSON object, no additional text.
     """
 
+@coin_analysis_bp.route('', methods=['POST'])
+def analyze_coin():
+    data = request.get_json()
+    crypto = data.get('crypto')
+    action = data.get('action') 
+    amount = data.get('amount')
+    api_key = os.getenv('GEMINI_API_KEY')
+
+    if not api_key:
+        return jsonify({'error': 'Gemini API key not set'}), 500
+    
+    if not crypto:
+        return jsonify({'error': 'Crypto symbol is required'}), 400
+
+    analysis_prompt = ANALYSIS_PROMPT_TEMPLATE.format(crypto=crypto, action=action, amount=amount)
+
     try:
-        genai.configure(api_key=api_key)
-        model = genai.GenerativeModel('gemini-2.5-flash')
+        model = get_model(api_key)
         
-        result = model.generate_content(analysis_prompt)
+        with stage('llm_call'):
+            result = generate(model, analysis_prompt)
         analysis_text = result.text.strip()
         
-        print(f"Raw analysis response: {analysis_text}")  # Debug log
+        log_payload(logger, 'coin_analysis.raw_response', crypto=crypto, response=analysis_text)
         
         # Remove markdown code blocks if present
         if '```json' in analysis_text:
@@ -71,7 +78,8 @@ def analyze_coin():
         elif '```' in analysis_text:
             analysis_text = analysis_text.split('```')[1].split('```')[0].strip()
         
-        analysis_data = json.loads(analysis_text)
+        with stage('json_parse'):
+            analysis_data = json.loads(analysis_text)
         
         # Add the request details to the response
         analysis_data['request'] = {
@@ -86,9 +94,13 @@ def analyze_coin():
         })
         
     except json.JSONDecodeError as e:
-        print(f"JSON parsing error: {e}")
-        print(f"Failed to parse: {analysis_text}")
+        logger.warning("Coin analysis JSON parsing error: %s", e)
+        log_payload(logger, 'coin_analysis.unparseable_response', crypto=crypto, response=analysis_text)
         return jsonify({'error': 'Failed to parse analysis response'}), 500
+    except LLMError as err:
+        logger.error("Gemini API error: %s", err)
+        return jsonify({'error': 'Failed to fetch coin analysis'}), 500
     except Exception as err:
-        print(f'Gemini API Error: {err}')
+        record_internal_error(type(err).__name__)
+        logger.exception("Coin analysis request failed")
         return jsonify({'error': 'Failed to fetch coin analysis'}), 500
\ No newline at end of file
@@ -1,11 +1,21 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, Response, current_app, request, jsonify
 import jwt
 from cryptography.hazmat.primitives import serialization
 import time
 import secrets
 import requests
 import os
+import gzip
+import logging
 from dotenv import load_dotenv
+from api.observability import stage, record_cache, record_upstream_error, record_internal_error
+from api.candle_store import candle_store
+
+# Brotli is optional; without it responses fall back to gzip
+try:
+    import brotli
+except ImportError:
+    brotli = None
 
 # Load environment variables from .env file
 load_dotenv()
@@ -16,6 +26,25 @@ historical_prices_bp = Blueprint('historical_prices', __name__)
 key_name = os.getenv('COINBASE_API_KEY_NAME')
 key_secret = os.getenv('COINBASE_API_KEY_SECRET')
 
+# Base URL for Coinbase requests; override to point at a local stub (benchmarks)
+api_base_url = os.getenv('COINBASE_API_URL', 'https://api.coinbase.com')
+
+logger = logging.getLogger(__name__)
+
+# Bodies smaller than this are not worth compressing
+MIN_COMPRESS_SIZE = 512
+
+# Parsed signing key, loaded once per process instead of on every request
+_private_key = None
+
+def get_private_key():
+    """Return the parsed Coinbase EC private key, parsing the PEM only on first use"""
+    global _private_key
+    record_cache('signing_key', _private_key is not None)
+    if _private_key is None:
+        _private_key = serialization.load_pem_private_key(key_secret.encode('utf-8'), password=None)
+    return _private_key
+
 # Build JWT Access token
 def build_jwt(uri):
     """
@@ -27,8 +56,7 @@ def build_jwt(uri):
     Returns:
         str: JWT token valid for 2 minutes
     """
-    private_key_bytes = key_secret.encode('utf-8')
-    private_key = serialization.load_pem_private_key(private_key_bytes, password=None)
+    private_key = get_private_key()
     jwt_payload = {
         'sub': key_name,
         'iss': "cdp",
@@ -44,6 +72,143 @@ def build_jwt(uri):
     )
     return jwt_token
 
+class CoinbaseError(Exception):
+    """Coinbase answered with a non-200 status"""
+
+    def __init__(self, status_code, text):
+        super().__init__(f"HTTP {status_code}: {text}")
+        self.status_code = status_code
+
+def fetch_candles(ticker, granularity, days_back):
+    """
+    Get a candle series from the store, or from Coinbase if it is missing or stale
+
+    Args:
+        ticker: Product id, e.g. "BTC-USD"
+        granularity: Coinbase granularity, e.g. "ONE_DAY"
+        days_back: How many days of history to request
+
+    Returns:
+        CandleSeries
+
+    Raises:
+        CoinbaseError: If Coinbase returns a non-200 response
+        requests.RequestException: If Coinbase could not be reached
+
+    Both are counted as Coinbase upstream errors; anything else (e.g. a missing
+    signing key) is a local failure and left to the caller.
+    """
+    key = (ticker.upper(), granularity, days_back)
+    series = candle_store.get(key)
+    record_cache('candles', series is not None)
+    if series is not None:
+        return series
+
+    host = "api.coinbase.com"
+    path = f"/api/v3/brokerage/products/{ticker}/candles"
+    method = "GET"
+    
+    # Build URI for JWT (without query parameters)
+    uri = f"{method} {host}{path}"
+    
+    # Generate JWT token
+    with stage('jwt_build'):
+        jwt_token = build_jwt(uri)
+    
+    # Build full URL
+    url = f"{api_base_url}{path}"
+    
+    # Query parameters
+    params = {
+        "start": str(int(time.time()) - (days_back * 86400)),  # 86400 seconds = 1 day
+        "end": str(int(time.time())),
+        "granularity": granularity
+    }
+    
+    # Set up headers
+    headers = {
+        "Authorization": f"Bearer {jwt_token}",
+        "Content-Type": "application/json"
+    }
+    
+    # Make the request
+    try:
+        with stage('upstream_fetch'):
+            response = requests.get(url, headers=headers, params=params)
+    except requests.RequestException as e:
+        record_upstream_error('coinbase', type(e).__name__)
+        raise
+    
+    if response.status_code != 200:
+        record_upstream_error('coinbase', response.status_code)
+        raise CoinbaseError(response.status_code, response.text)
+    return candle_store.put(key, response.content, response.json())
+
+def compact_candles(data):
+    """
+    Convert Coinbase candles into parallel numeric arrays
+
+    Coinbase sends every candle as an object of string fields; the compact form is
+    {"t": [...], "o": [...], "h": [...], "l": [...], "c": [...], "v": [...]}
+    with t in unix seconds, newest candle first (same order as Coinbase).
+    """
+    candles = data.get('candles', [])
+    return {
+        't': [int(c['start']) for c in candles],
+        'o': [float(c['open']) for c in candles],
+        'h': [float(c['high']) for c in candles],
+        'l': [float(c['low']) for c in candles],
+        'c': [float(c['close']) for c in candles],
+        'v': [float(c['volume']) for c in candles],
+    }
+
+def choose_encoding():
+    """Pick the best Content-Encoding the client accepts (br, gzip or identity)"""
+    if brotli is not None and request.accept_encodings['br']:
+        return 'br'
+    if request.accept_encodings['gzip']:
+        return 'gzip'
+    return 'identity'
+
+def encode_body(series, ticker, granularity, days_back, fmt, encoding):
+    """
+    Serialize (and compress) a series once per version, format and encoding
+
+    Returns:
+        tuple: (body bytes, Content-Encoding actually applied)
+    """
+    cache_key = (fmt, encoding)
+    cached = series.bodies.get(cache_key)
+    if cached is not None:
+        return cached
+
+    identity = series.bodies.get((fmt, 'identity'))
+    if identity is None:
+        payload = {
+            'success': True,
+            'ticker': ticker.upper(),
+            'granularity': granularity,
+            'days_back': days_back,
+        }
+        if fmt == 'compact':
+            payload['format'] = 'compact'
+            payload['data'] = compact_candles(series.data)
+        else:
+            payload['data'] = series.data
+        identity = current_app.json.dumps(payload).encode('utf-8')
+        series.bodies[(fmt, 'identity')] = (identity, 'identity')
+    else:
+        identity = identity[0]
+
+    if encoding == 'identity' or len(identity) < MIN_COMPRESS_SIZE:
+        encoded = (identity, 'identity')
+    elif encoding == 'br':
+        encoded = (brotli.compress(identity), 'br')
+    else:
+        encoded = (gzip.compress(identity), 'gzip')
+    series.bodies[cache_key] = encoded
+    return encoded
+
 @historical_prices_bp.route('/<ticker>', methods=['GET'])
 def get_historical_prices(ticker):
     """
@@ -53,65 +218,73 @@ def get_historical_prices(ticker):
     Query params (optional):
         - granularity: ONE_DAY (default), ONE_HOUR, etc.
         - days_back: 350 (default)
+        - format: raw (default, Coinbase candles) or compact (parallel numeric arrays)
     
-    Example: /api/historical-prices/BTC-USD?granularity=ONE_DAY&days_back=350
+    Responses carry an ETag and Last-Modified for the candle series; repeat polls
+    sending If-None-Match / If-Modified-Since get a 304 while the candles are unchanged.
+    Bodies are gzip/br compressed when the client accepts it.
+    
+    Example: /api/historical-prices/BTC-USD?granularity=ONE_DAY&days_back=350&format=compact
     """
     # Get optional query parameters
     granularity = request.args.get('granularity', 'ONE_DAY')
     days_back = request.args.get('days_back', 350, type=int)
+    fmt = request.args.get('format', 'raw')
     
-    host = "api.coinbase.com"
-    path = f"/api/v3/brokerage/products/{ticker}/candles"
-    method = "GET"
-    
-    # Build URI for JWT (without query parameters)
-    uri = f"{method} {host}{path}"
+    if fmt not in ('raw', 'compact'):
+        return jsonify({
+            'success': False,
+            'ticker': ticker.upper(),
+            'error': f"Unknown format '{fmt}', expected 'raw' or 'compact'"
+        }), 400
     
     try:
-        # Generate JWT token
-        jwt_token = build_jwt(uri)
-        
-        # Build full URL
-        url = f"https://{host}{path}"
+        series = fetch_candles(ticker, granularity, days_back)
         
-        # Query parameters
-        params = {
-            "start": str(int(time.time()) - (days_back * 86400)),  # 86400 seconds = 1 day
-            "end": str(int(time.time())),
-            "granularity": granularity
-        }
-        
-        # Set up headers
-        headers = {
-            "Authorization": f"Bearer {jwt_token}",
-            "Content-Type": "application/json"
-        }
+        response = Response(status=200, mimetype='application/json')
+        response.set_etag(series.etag(fmt), weak=True)
+        response.last_modified = int(series.last_modified)
+        response.cache_control.no_cache = True
+        response.vary.add('Accept-Encoding')
         
-        # Make the request
-        response = requests.get(url, headers=headers, params=params)
+        # Conditional GET: nothing changed since the client's copy, skip the body
+        if request.if_none_match:
+            not_modified = request.if_none_match.contains_weak(series.etag(fmt))
+        else:
+            not_modified = (
+                request.if_modified_since is not None
+                and int(series.last_modified) <= request.if_modified_since.timestamp()
+            )
+        if not_modified:
+            response.status_code = 304
+            return response
         
-        if response.status_code == 200:
-            # bug fixing
-            # print("-------------------")
-            # print(response.json())
-            # print("-------------------")
-            
+        encoding = choose_encoding()
+        body, applied = encode_body(series, ticker, granularity, days_back, fmt, encoding)
+        if applied != 'identity':
+            response.content_encoding = applied
+        response.set_data(body)
+        return response
+    
+    except CoinbaseError as e:
+        logger.warning("Coinbase candles for %s returned HTTP %s", ticker, e.status_code)
+        return jsonify({
+            'success': False,
+            'ticker': ticker.upper(),
+            'error': str(e)
+        }), 400
             
-            return jsonify({
-                'success': True,
-                'ticker': ticker.upper(),
-                'granularity': granularity,
-                'days_back': days_back,
-                'data': response.json()
-            }), 200
-        else:
-            return jsonify({
-                'success': False,
-                'ticker': ticker.upper(),
-                'error': f"HTTP {response.status_code}: {response.text}"
-            }), 400
+    except requests.RequestException as e:
+        logger.warning("Coinbase candles for %s could not be fetched: %s", ticker, e)
+        return jsonify({
+            'success': False,
+            'ticker': ticker.upper(),
+            'error': str(e)
+        }), 500
             
     except Exception as e:
+        record_internal_error(type(e).__name__)
+        logger.exception("Historical prices request for %s failed", ticker)
         return jsonify({
             'success': False,
             'ticker': ticker.upper(),
@@ -123,4 +296,3 @@ if __name__ == "__main__":
     # This is just for testing the helper function directly
     print("Testing get_historical_prices function...")
     print("Note: To test the API endpoint, run app.py instead")
-
@@ -0,0 +1,66 @@
+import os
+import threading
+from api.observability import stage, record_upstream_error
+
+MODEL_NAME = 'gemini-2.5-flash'
+
+# Optional override of the Gemini endpoint, e.g. a local stub for benchmarks
+# (GEMINI_API_ENDPOINT=http://127.0.0.1:9001). Uses the REST transport when set.
+api_endpoint = os.getenv('GEMINI_API_ENDPOINT')
+
+# When to import the Gemini SDK (google.generativeai pulls in gRPC and protobuf):
+#   lazy       - on the first LLM request (default)
+#   background - in a worker thread right after the process starts serving
+#   eager      - at app import, before serving anything
+import_mode = os.getenv('GEMINI_IMPORT_MODE', 'lazy')
+
+_genai = None
+_sdk_lock = threading.Lock()
+
+def load_sdk():
+    """Import google.generativeai once per process and return it"""
+    global _genai
+    if _genai is None:
+        with _sdk_lock:
+            if _genai is None:
+                with stage('sdk_import'):
+                    import google.generativeai as genai
+                _genai = genai
+    return _genai
+
+def sdk_loaded():
+    """Whether the Gemini SDK has been imported in this process"""
+    return _genai is not None
+
+class LLMError(Exception):
+    """The Gemini API call itself failed (network, quota, server or SDK API error)"""
+
+def generate(model, prompt):
+    """
+    Call the model, counting any failure as a Gemini upstream error
+
+    Raises:
+        LLMError: Wrapping whatever the SDK raised
+    """
+    try:
+        return model.generate_content(prompt)
+    except Exception as err:
+        record_upstream_error('gemini', type(err).__name__)
+        raise LLMError(str(err)) from err
+
+def get_model(api_key):
+    """
+    Configure the Gemini SDK and return the model used by the chat and analysis endpoints
+
+    Args:
+        api_key: Gemini API key
+
+    Returns:
+        genai.GenerativeModel
+    """
+    genai = load_sdk()
+    if api_endpoint:
+        genai.configure(api_key=api_key, transport='rest', client_options={'api_endpoint': api_endpoint})
+    else:
+        genai.configure(api_key=api_key)
+    return genai.GenerativeModel(MODEL_NAME)
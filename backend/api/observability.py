@@ -0,0 +1,139 @@
+import json
+import logging
+import os
+import random
+import time
+from contextlib import contextmanager
+
+from flask import Blueprint, Response, g, has_request_context, request
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+
+# Blueprint exposing the Prometheus scrape endpoint
+metrics_bp = Blueprint('metrics', __name__)
+
+REQUEST_LATENCY = Histogram(
+    'http_request_duration_seconds',
+    'Request latency per route',
+    ['route', 'method', 'status'],
+)
+STAGE_LATENCY = Histogram(
+    'request_stage_duration_seconds',
+    'Time spent in each stage of a request',
+    ['route', 'stage'],
+)
+CACHE_EVENTS = Counter(
+    'cache_events_total',
+    'Cache lookups by cache name and result (hit/miss)',
+    ['cache', 'result'],
+)
+UPSTREAM_ERRORS = Counter(
+    'upstream_errors_total',
+    'Failed calls to upstream services',
+    ['upstream', 'reason'],
+)
+INTERNAL_ERRORS = Counter(
+    'internal_errors_total',
+    'Requests that failed inside the backend (bugs, missing config), not upstream',
+    ['route', 'reason'],
+)
+
+# Fraction of debug payloads that actually get logged (0.0 - 1.0)
+PAYLOAD_SAMPLE_RATE = float(os.getenv('DEBUG_PAYLOAD_SAMPLE_RATE', '0.1'))
+
+
+def _route_label():
+    """Return the matched URL rule so metrics are labelled per route, not per URL."""
+    if has_request_context() and request.url_rule is not None:
+        return request.url_rule.rule
+    return 'unmatched'
+
+
+@contextmanager
+def stage(name):
+    """
+    Time one stage of the current request (jwt_build, upstream_fetch, llm_call, ...)
+
+    Usage:
+        with stage('llm_call'):
+            result = model.generate_content(prompt)
+    """
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        STAGE_LATENCY.labels(route=_route_label(), stage=name).observe(time.perf_counter() - start)
+
+
+def record_cache(cache, hit):
+    """Count a cache hit or miss"""
+    CACHE_EVENTS.labels(cache=cache, result='hit' if hit else 'miss').inc()
+
+
+def record_upstream_error(upstream, reason):
+    """Count a failed call to an upstream service (coinbase, gemini)"""
+    UPSTREAM_ERRORS.labels(upstream=upstream, reason=str(reason)).inc()
+
+
+def record_internal_error(reason):
+    """Count a failure of our own code or config, kept apart from upstream errors"""
+    INTERNAL_ERRORS.labels(route=_route_label(), reason=str(reason)).inc()
+
+
+def log_payload(logger, event, **fields):
+    """
+    Log a large debug payload (raw model output, upstream body) as one JSON line.
+
+    Only emitted when the logger is at DEBUG level, and then only for a sampled
+    fraction of calls (DEBUG_PAYLOAD_SAMPLE_RATE) so it stays off the hot path.
+    """
+    if not logger.isEnabledFor(logging.DEBUG):
+        return
+    if random.random() >= PAYLOAD_SAMPLE_RATE:
+        return
+    logger.debug(json.dumps({'event': event, **fields}, default=str))
+
+
+def _start_timer():
+    g._request_start = time.perf_counter()
+
+
+def _record_request(response):
+    start = g.pop('_request_start', None)
+    if start is not None:
+        REQUEST_LATENCY.labels(
+            route=_route_label(),
+            method=request.method,
+            status=response.status_code,
+        ).observe(time.perf_counter() - start)
+    return response
+
+
+@metrics_bp.route('/metrics', methods=['GET'])
+def metrics():
+    """
+    Prometheus scrape endpoint
+
+    Under gunicorn, set PROMETHEUS_MULTIPROC_DIR (gunicorn.conf.py does this) so
+    every worker writes its samples there and the scrape sums them across workers.
+    """
+    if os.getenv('PROMETHEUS_MULTIPROC_DIR'):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return Response(generate_latest(registry), content_type=CONTENT_TYPE_LATEST)
+
+
+def init_app(app):
+    """Register request timing hooks and the /metrics endpoint on the app"""
+    app.before_request(_start_timer)
+    app.after_request(_record_request)
+    app.register_blueprint(metrics_bp)
@@ -0,0 +1,234 @@
+from flask import Blueprint, request, jsonify
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+import requests
+from dotenv import load_dotenv
+from api.getData import fetch_candles
+from api.observability import stage, record_upstream_error
+from api.portfolio_store import PortfolioStore
+
+# File locking is POSIX-only; without it the job only runs in a single-process server
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+# Load environment variables from .env file
+load_dotenv()
+
+# Create Blueprint for portfolio history API
+portfolio_history_bp = Blueprint('portfolio_history', __name__)
+
+logger = logging.getLogger(__name__)
+
+supabase_url = os.getenv('SUPABASE_URL')
+supabase_key = os.getenv('SUPABASE_KEY')
+
+# Seconds between snapshots (0 disables the job)
+snapshot_interval = int(os.getenv('PORTFOLIO_SNAPSHOT_INTERVAL', 300))
+
+history_dir = os.getenv(
+    'PORTFOLIO_HISTORY_DIR',
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data', 'portfolio_history'),
+)
+
+portfolio_store = PortfolioStore(history_dir)
+
+# Supabase (PostgREST) returns at most this many rows per request
+PAGE_SIZE = 1000
+
+# The portfolio table has no user column yet (the frontend shares one portfolio),
+# so all holdings are recorded under the id the chat endpoint uses
+DEFAULT_USER_ID = 'default_user'
+
+def fetch_all_holdings():
+    """
+    Read the holdings from the Supabase portfolio table in one pass
+
+    The table (id, crypto_ticker, quantity, purchase_price, created_at) holds a single
+    shared portfolio, so every row is filed under DEFAULT_USER_ID. Grouping is kept
+    per user so a user column can be added later without changing the callers.
+
+    Returns:
+        dict: {user_id: {ticker: quantity}}
+    """
+    headers = {
+        'apikey': supabase_key,
+        'Authorization': f"Bearer {supabase_key}",
+    }
+    holdings = {}
+    offset = 0
+    while True:
+        headers['Range'] = f"{offset}-{offset + PAGE_SIZE - 1}"
+        response = requests.get(
+            f"{supabase_url}/rest/v1/portfolio",
+            headers=headers,
+            params={'select': 'crypto_ticker,quantity', 'order': 'id'},
+            timeout=10,
+        )
+        if response.status_code not in (200, 206):
+            record_upstream_error('supabase', response.status_code)
+            raise RuntimeError(f"Supabase HTTP {response.status_code}: {response.text}")
+        rows = response.json()
+        for row in rows:
+            # A ticker can appear on several rows (one per purchase), so sum them
+            user = holdings.setdefault(DEFAULT_USER_ID, {})
+            ticker = row['crypto_ticker'].upper()
+            user[ticker] = user.get(ticker, 0.0) + float(row['quantity'])
+        if len(rows) < PAGE_SIZE:
+            return holdings
+        offset += PAGE_SIZE
+
+def fetch_prices(tickers):
+    """
+    Latest USD price for each ticker, one candle lookup per distinct ticker
+
+    Uses the same candle series as the home page carousel, so prices usually come
+    straight from the candle store. Tickers that cannot be priced are left out.
+    """
+    def price(ticker):
+        try:
+            candles = fetch_candles(f"{ticker}-USD", 'ONE_DAY', 2).data.get('candles', [])
+            return ticker, float(candles[0]['close']) if candles else None
+        except Exception as e:
+            logger.warning("Could not price %s for portfolio snapshot: %s", ticker, e)
+            return ticker, None
+
+    prices = {'CASH': 1.0}
+    to_fetch = [t for t in tickers if t != 'CASH']
+    if to_fetch:
+        with ThreadPoolExecutor(max_workers=min(8, len(to_fetch))) as pool:
+            for ticker, value in pool.map(price, to_fetch):
+                if value is not None:
+                    prices[ticker] = value
+    return prices
+
+def snapshot_all(now=None):
+    """
+    Value every user's portfolio with one batched pricing pass and store the results
+
+    Users holding a coin that could not be priced are skipped this round rather than
+    recorded with a misleading total.
+
+    Returns:
+        dict: {user_id: total USD value} for the users that were recorded
+    """
+    now = int(now or time.time())
+    with stage('snapshot_holdings'):
+        holdings = fetch_all_holdings()
+    tickers = {ticker for positions in holdings.values() for ticker in positions}
+    with stage('snapshot_pricing'):
+        prices = fetch_prices(tickers)
+
+    recorded = {}
+    for user_id, positions in holdings.items():
+        if any(ticker not in prices for ticker in positions):
+            continue
+        total = sum(quantity * prices[ticker] for ticker, quantity in positions.items())
+        portfolio_store.append(user_id, now, total)
+        recorded[user_id] = total
+    logger.info("Recorded portfolio snapshots for %d of %d users", len(recorded), len(holdings))
+    return recorded
+
+def _run_scheduler():
+    # Only one process (e.g. one gunicorn worker) takes snapshots: whoever holds the lock.
+    # If that process dies the lock is released and another worker takes over.
+    # Without fcntl, start_scheduler only gets here in a single-process server.
+    os.makedirs(history_dir, exist_ok=True)
+    lock_file = open(os.path.join(history_dir, 'snapshot.lock'), 'w')
+    has_lock = fcntl is None
+    while True:
+        if not has_lock:
+            try:
+                fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                has_lock = True
+            except OSError:
+                pass
+        if has_lock:
+            try:
+                snapshot_all()
+            except Exception as e:
+                logger.error("Portfolio snapshot failed: %s", e)
+        time.sleep(snapshot_interval - time.time() % snapshot_interval)
+
+_scheduler_started = False
+
+def start_scheduler(single_process=False):
+    """
+    Start the periodic snapshot job on a background thread
+
+    Must run after forking (gunicorn post_fork), since threads do not survive a fork.
+
+    Args:
+        single_process: True when this is the only server process (python app.py).
+            Without fcntl the workers cannot elect one snapshot taker, so the job
+            then only runs in that case.
+    """
+    global _scheduler_started
+    if _scheduler_started or snapshot_interval <= 0:
+        return
+    if not (supabase_url and supabase_key):
+        logger.info("SUPABASE_URL / SUPABASE_KEY not set, portfolio snapshots disabled")
+        return
+    if fcntl is None and not single_process:
+        logger.warning("File locking is unavailable on this platform, portfolio snapshots disabled in multi-process servers")
+        return
+    _scheduler_started = True
+    threading.Thread(target=_run_scheduler, daemon=True).start()
+
+def performance_summary(user_id, now=None):
+    """
+    Short text summary of how a portfolio's value has changed, for the chat prompt
+
+    Returns:
+        str: Empty if there is no recorded history for the user
+    """
+    now = int(now or time.time())
+    latest = portfolio_store.latest(user_id)
+    if latest is None:
+        return ""
+    _, current = latest
+
+    lines = []
+    for label, seconds in (('24 hours', 86400), ('7 days', 7 * 86400), ('30 days', 30 * 86400)):
+        past = portfolio_store.value_at(user_id, now - seconds)
+        if past:
+            change = (current - past) / past * 100
+            lines.append(f"- Last {label}: ${past:.2f} -> ${current:.2f} ({change:+.2f}%)\n")
+    return "".join(lines)
+
+@portfolio_history_bp.route('/<user_id>', methods=['GET'])
+def get_portfolio_history(user_id):
+    """
+    API endpoint to get the recorded value history of a user's portfolio
+
+    URL: /api/portfolio-history/<user_id>
+    Query params (optional):
+        - start: unix seconds (default: 7 days ago)
+        - end: unix seconds (default: now)
+        - max_points: 500 (default), older ranges come from coarser tiers
+
+    Example: /api/portfolio-history/default_user?start=1730000000&max_points=200
+    """
+    now = int(time.time())
+    start = request.args.get('start', now - 7 * 86400, type=int)
+    end = request.args.get('end', now, type=int)
+    max_points = request.args.get('max_points', 500, type=int)
+
+    if start > end or max_points <= 0:
+        return jsonify({
+            'success': False,
+            'user_id': user_id,
+            'error': 'start must be <= end and max_points must be positive'
+        }), 400
+
+    return jsonify({
+        'success': True,
+        'user_id': user_id,
+        'start': start,
+        'end': end,
+        'data': portfolio_store.query(user_id, start, end, max_points)
+    }), 200
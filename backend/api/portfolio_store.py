@@ -0,0 +1,161 @@
+import bisect
+import hashlib
+import os
+import re
+import struct
+import threading
+import time
+
+# One point on disk: uint32 unix seconds + float64 USD value, little-endian
+RECORD = struct.Struct('<Id')
+
+# Downsampling tiers as (bucket seconds, retention seconds or None to keep forever).
+# Every snapshot lands in each tier; a tier keeps only the latest value per bucket.
+TIERS = [
+    (300, 2 * 86400),         # 5 minutes, last 2 days
+    (3600, 30 * 86400),       # hourly, last 30 days
+    (86400, None),            # daily, forever
+]
+
+SAFE_USER_ID = re.compile(r'^[A-Za-z0-9_-]{1,64}$')
+
+class PortfolioStore:
+    """
+    Append-only, downsampled time series of portfolio values, one set of files per user
+
+    Each tier is a flat file of fixed-size records. A new point either overwrites the
+    last record (same bucket) or is appended; old records are only dropped when a
+    tier is compacted past its retention.
+
+    Args:
+        directory: Where the tier files live
+        tiers: List of (bucket seconds, retention seconds or None)
+        clock: Returns the current unix time; decides which tiers still cover a timestamp
+    """
+
+    def __init__(self, directory, tiers=TIERS, clock=time.time):
+        self.directory = directory
+        self.tiers = tiers
+        self.clock = clock
+        self._lock = threading.Lock()
+
+    def _path(self, user_id, bucket):
+        # User ids become file names, so anything unusual is hashed
+        name = user_id if SAFE_USER_ID.match(user_id) else hashlib.sha1(user_id.encode('utf-8')).hexdigest()
+        return os.path.join(self.directory, f"{name}.{bucket}.bin")
+
+    def _read(self, path):
+        """Return (timestamps, values) lists for one tier file"""
+        try:
+            with open(path, 'rb') as f:
+                raw = f.read()
+        except FileNotFoundError:
+            return [], []
+        # Ignore a trailing partial record from a concurrent write
+        raw = raw[:len(raw) - len(raw) % RECORD.size]
+        timestamps, values = [], []
+        for ts, value in RECORD.iter_unpack(raw):
+            timestamps.append(ts)
+            values.append(value)
+        return timestamps, values
+
+    def append(self, user_id, timestamp, value):
+        """
+        Record one portfolio valuation in every tier
+
+        Tiers must stay sorted for the bisect lookups, so a point whose bucket is older
+        than a tier's last stored bucket is dropped from that tier.
+        """
+        os.makedirs(self.directory, exist_ok=True)
+        with self._lock:
+            for bucket, retention in self.tiers:
+                path = self._path(user_id, bucket)
+                bucket_start = int(timestamp) - int(timestamp) % bucket
+                record = RECORD.pack(bucket_start, value)
+
+                mode = 'r+b' if os.path.exists(path) else 'w+b'
+                with open(path, mode) as f:
+                    size = f.seek(0, os.SEEK_END)
+                    size -= size % RECORD.size
+                    if size:
+                        f.seek(size - RECORD.size)
+                        last_bucket, _ = RECORD.unpack(f.read(RECORD.size))
+                        if bucket_start < last_bucket:
+                            continue
+                        # Same bucket: overwrite so the tier keeps the latest value
+                        if last_bucket == bucket_start:
+                            size -= RECORD.size
+                    f.seek(size)
+                    f.write(record)
+                    f.truncate()
+
+                if retention is not None:
+                    self._compact(path, bucket_start - retention)
+
+    def _compact(self, path, cutoff):
+        """Rewrite a tier without points older than cutoff, once they make up a tenth of it"""
+        with open(path, 'rb') as f:
+            first = f.read(RECORD.size)
+        if len(first) < RECORD.size or RECORD.unpack(first)[0] >= cutoff:
+            return
+        timestamps, values = self._read(path)
+        drop = bisect.bisect_left(timestamps, cutoff)
+        if drop * 10 < len(timestamps):
+            return
+        tmp = f"{path}.tmp"
+        with open(tmp, 'wb') as f:
+            f.write(b''.join(RECORD.pack(ts, v) for ts, v in zip(timestamps[drop:], values[drop:])))
+        os.replace(tmp, path)
+
+    def _tier_for(self, timestamp):
+        """Finest tier whose retention window still reaches back to timestamp"""
+        now = self.clock()
+        for bucket, retention in self.tiers:
+            if retention is None or timestamp >= now - retention:
+                return bucket
+        return self.tiers[-1][0]
+
+    def query(self, user_id, start, end, max_points=500):
+        """
+        Points between start and end (unix seconds, inclusive)
+
+        Reads the finest tier that still covers `start`, then thins it evenly if it
+        has more than max_points points.
+
+        Returns:
+            dict: {"t": [...], "v": [...], "resolution": bucket seconds}
+        """
+        resolution = self._tier_for(start)
+        timestamps, values = self._read(self._path(user_id, resolution))
+
+        lo = bisect.bisect_left(timestamps, start)
+        hi = bisect.bisect_right(timestamps, end)
+        timestamps, values = timestamps[lo:hi], values[lo:hi]
+
+        if max_points and len(timestamps) > max_points:
+            # Evenly spaced picks that always keep the newest point
+            last = len(timestamps) - 1
+            if max_points == 1:
+                picks = [last]
+            else:
+                picks = sorted({round(i * last / (max_points - 1)) for i in range(max_points)})
+            timestamps = [timestamps[i] for i in picks]
+            values = [values[i] for i in picks]
+
+        return {'t': timestamps, 'v': [round(v, 2) for v in values], 'resolution': resolution}
+
+    def value_at(self, user_id, timestamp):
+        """Latest recorded value at or before timestamp (within two buckets), or None"""
+        bucket = self._tier_for(timestamp)
+        timestamps, values = self._read(self._path(user_id, bucket))
+        index = bisect.bisect_right(timestamps, timestamp) - 1
+        if index >= 0 and timestamp - timestamps[index] <= 2 * bucket:
+            return values[index]
+        return None
+
+    def latest(self, user_id):
+        """Most recent (timestamp, value), or None if the user has no history"""
+        timestamps, values = self._read(self._path(user_id, self.tiers[0][0]))
+        if not timestamps:
+            return None
+        return timestamps[-1], values[-1]
@@ -0,0 +1,108 @@
+from flask import Blueprint, jsonify
+import logging
+import os
+import threading
+import time
+from api import llm
+from api.getData import get_private_key, key_secret
+
+# Blueprint exposing the readiness probe
+readiness_bp = Blueprint('readiness', __name__)
+
+logger = logging.getLogger(__name__)
+
+# Warm-up progress of this process, reported by /ready. sdk_warm_up is one of:
+#   deferred - lazy mode, the SDK is imported by the first LLM request
+#   pending  - waiting for start_warm_up (background mode, or eager mode under a
+#              preloading gunicorn master), which runs after forking
+#   running, done
+#   error    - terminal: the worker serves, LLM endpoints retry the import per request
+status = {
+    'preloaded': False,
+    'signing_key': 'not_configured',
+    'sdk_warm_up': 'pending' if llm.import_mode in ('background', 'eager') else 'deferred',
+    'preload_seconds': None,
+    'preload_pid': None,
+}
+
+def preload():
+    """
+    Build shared read-only state once, before gunicorn forks workers (preload_app)
+
+    Parses the Coinbase signing key and, in eager mode, imports the Gemini SDK,
+    unless this is a preloading gunicorn master: gRPC must not be imported before
+    a fork, so start_warm_up does it in each worker instead.
+    The candle store and the static prompt text (CHAT_PROMPT_TEMPLATE,
+    ANALYSIS_PROMPT_TEMPLATE) are module-level and shared by importing the app;
+    only the per-request fields are filled in when a request arrives.
+    """
+    start = time.perf_counter()
+    if key_secret:
+        try:
+            get_private_key()
+            status['signing_key'] = 'loaded'
+        except Exception as e:
+            status['signing_key'] = 'error'
+            logger.error("Could not parse COINBASE_API_KEY_SECRET: %s", e)
+    if llm.import_mode == 'eager':
+        if os.getenv('GUNICORN_PRELOAD_APP') == '1':
+            logger.warning("GEMINI_IMPORT_MODE=eager with gunicorn preload_app: importing the Gemini SDK in each worker after fork")
+        else:
+            _warm_up_sdk()
+    status['preload_seconds'] = round(time.perf_counter() - start, 4)
+    # Differs from the serving pid when this ran in the gunicorn master
+    status['preload_pid'] = os.getpid()
+    status['preloaded'] = True
+
+def _warm_up_sdk():
+    status['sdk_warm_up'] = 'running'
+    try:
+        llm.load_sdk()
+        status['sdk_warm_up'] = 'done'
+    except Exception as e:
+        status['sdk_warm_up'] = 'error'
+        logger.error("Gemini SDK warm-up failed, serving with LLM endpoints degraded: %s", e)
+
+def start_warm_up():
+    """
+    Import the Gemini SDK if preload left it pending
+
+    On a background thread with GEMINI_IMPORT_MODE=background; inline, before the
+    worker serves, with eager mode under a preloading master. Must run after
+    forking (gunicorn post_fork), since gRPC does not survive a fork.
+    """
+    if status['sdk_warm_up'] != 'pending':
+        return
+    if llm.import_mode == 'background':
+        status['sdk_warm_up'] = 'running'
+        threading.Thread(target=_warm_up_sdk, daemon=True).start()
+    elif llm.import_mode == 'eager':
+        _warm_up_sdk()
+
+def is_ready():
+    """
+    Ready once this process has finished the warm-up work it was asked to do
+
+    A failed SDK warm-up counts as finished: the worker serves with the LLM
+    endpoints degraded rather than staying unready forever.
+    """
+    return status['preloaded'] and status['sdk_warm_up'] in ('deferred', 'done', 'error')
+
+@readiness_bp.route('/ready', methods=['GET'])
+def ready():
+    """
+    Readiness probe
+
+    Returns 200 when the worker is warm enough to serve, 503 while warming up.
+    The status is per process, so behind gunicorn it describes whichever worker
+    answered (see pid).
+    """
+    ready_now = is_ready()
+    return jsonify({
+        'ready': ready_now,
+        'pid': os.getpid(),
+        'gemini_import_mode': llm.import_mode,
+        'gemini_sdk_loaded': llm.sdk_loaded(),
+        'llm_degraded': status['sdk_warm_up'] == 'error' and not llm.sdk_loaded(),
+        **status,
+    }), 200 if ready_now else 503
@@ -1,22 +1,41 @@
 from flask import Flask
 from flask_cors import CORS
 from dotenv import load_dotenv
+import logging
 import os
+from api import observability, startup
 from api.gemini import gemini_bp
 from api.gemini_coin_analysis import coin_analysis_bp
 from api.getData import historical_prices_bp
+from api.portfolio_history import portfolio_history_bp, start_scheduler
 
 load_dotenv()
 
+logging.basicConfig(
+    level=os.getenv('LOG_LEVEL', 'INFO').upper(),
+    format='%(asctime)s %(levelname)s %(name)s %(message)s',
+)
+
 app = Flask(__name__)
 CORS(app)
 
+# Request latency / stage metrics, served on /metrics
+observability.init_app(app)
+
 # Register blueprints
 app.register_blueprint(gemini_bp, url_prefix='/api/gemini')
 app.register_blueprint(coin_analysis_bp, url_prefix='/api/gemini-coin-analysis')
 app.register_blueprint(historical_prices_bp, url_prefix='/api/historical-prices')
+app.register_blueprint(portfolio_history_bp, url_prefix='/api/portfolio-history')
+app.register_blueprint(startup.readiness_bp)
+
+# Parse keys (and import the Gemini SDK in eager mode) before serving; with
+# gunicorn's preload_app this runs once in the master and is shared by workers
+startup.preload()
 
 if __name__ == '__main__':
     PORT = int(os.getenv('PORT', 4000))
     print(f'Backend running on port {PORT}')
+    startup.start_warm_up()
+    start_scheduler(single_process=True)
     app.run(host='0.0.0.0', port=PORT, debug=False)
\ No newline at end of file
@@ -0,0 +1,275 @@
+"""
+Reproducible load test for the backend
+
+Starts the Flask app in-process against local Coinbase and Gemini stubs, replays
+the request patterns the frontend produces and prints a JSON report.
+
+Run from the backend directory:
+    python -m benchmarks.load_test
+    python -m benchmarks.load_test --tabs 10 --interval 0 --output before.json
+    python -m benchmarks.load_test --output after.json --baseline before.json
+
+Scenarios:
+    poll: every tab fetches 5 tickers concurrently every --interval seconds
+          (home page carousel: ?granularity=ONE_DAY&days_back=2)
+    chat: --bursts bursts of --burst-size concurrent /api/gemini requests
+"""
+
+import argparse
+import json
+import logging
+import math
+import os
+import platform
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import ec
+
+from benchmarks.stubs import CoinbaseStub, GeminiStub
+
+TICKERS = ["BTC-USD", "ETH-USD", "SOL-USD", "ADA-USD", "DOT-USD"]
+
+PORTFOLIO = [
+    {'ticker': 'BTC', 'quantity': 0.5, 'totalValue': 33000.0},
+    {'ticker': 'ETH', 'quantity': 2, 'totalValue': 6400.0},
+    {'ticker': 'CASH', 'quantity': 2500.0, 'totalValue': 2500.0},
+]
+
+
+def percentile(values, pct):
+    """Nearest-rank percentile of a list of numbers"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(pct / 100 * len(ordered)) - 1)]
+
+
+def git_commit():
+    try:
+        return subprocess.check_output(
+            ['git', 'rev-parse', '--short', 'HEAD'], stderr=subprocess.DEVNULL, text=True
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def configure_environment(coinbase, gemini):
+    """Point the backend at the stubs; must run before the app is imported"""
+    key = ec.generate_private_key(ec.SECP256R1())
+    pem = key.private_bytes(
+        serialization.Encoding.PEM,
+        serialization.PrivateFormat.TraditionalOpenSSL,
+        serialization.NoEncryption(),
+    ).decode('utf-8')
+    os.environ['COINBASE_API_KEY_NAME'] = 'organizations/bench/apiKeys/bench'
+    os.environ['COINBASE_API_KEY_SECRET'] = pem
+    os.environ['COINBASE_API_URL'] = coinbase.url
+    os.environ['GEMINI_API_KEY'] = 'bench'
+    os.environ['GEMINI_API_ENDPOINT'] = gemini.url
+
+
+def start_app():
+    """Serve the Flask app on a background thread and return its base URL"""
+    from werkzeug.serving import make_server
+    from app import app
+
+    # Per-request access logs would dominate the run's output
+    logging.getLogger('werkzeug').setLevel(logging.WARNING)
+    server = make_server('127.0.0.1', 0, app, threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_port}"
+
+
+class Recorder:
+    """
+    Collects per-request latency and status from many threads
+
+    requests.Session is not thread-safe, so each worker thread gets its own.
+    """
+
+    def __init__(self):
+        self.latencies = []
+        self.errors = 0
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def _session(self):
+        session = getattr(self._local, 'session', None)
+        if session is None:
+            session = self._local.session = requests.Session()
+        return session
+
+    def call(self, method, url, **kwargs):
+        session = self._session()
+        start = time.perf_counter()
+        try:
+            ok = session.request(method, url, timeout=30, **kwargs).status_code == 200
+        except requests.RequestException:
+            ok = False
+        elapsed = time.perf_counter() - start
+        with self._lock:
+            self.latencies.append(elapsed)
+            if not ok:
+                self.errors += 1
+
+
+def run_poll(base_url, tabs, rounds, interval):
+    """Each tab fetches all carousel tickers concurrently, once per interval"""
+    recorder = Recorder()
+
+    with ThreadPoolExecutor(max_workers=tabs * len(TICKERS)) as pool:
+        for round_number in range(rounds):
+            round_start = time.perf_counter()
+            futures = [
+                pool.submit(
+                    recorder.call, 'GET',
+                    f"{base_url}/api/historical-prices/{ticker}",
+                    params={'granularity': 'ONE_DAY', 'days_back': 2},
+                )
+                for _ in range(tabs)
+                for ticker in TICKERS
+            ]
+            for future in futures:
+                future.result()
+            if round_number < rounds - 1:
+                time.sleep(max(0.0, interval - (time.perf_counter() - round_start)))
+    return recorder
+
+
+def run_chat(base_url, bursts, burst_size, pause):
+    """Bursts of concurrent chat requests, as when several users hit send at once"""
+    recorder = Recorder()
+    body = {'prompt': 'should I buy bitcoin or xrp', 'portfolio': PORTFOLIO}
+
+    with ThreadPoolExecutor(max_workers=burst_size) as pool:
+        for burst in range(bursts):
+            futures = [
+                pool.submit(recorder.call, 'POST', f"{base_url}/api/gemini", json=body)
+                for _ in range(burst_size)
+            ]
+            for future in futures:
+                future.result()
+            if burst < bursts - 1:
+                time.sleep(pause)
+    return recorder
+
+
+def measure(name, run, stubs):
+    """Run one scenario and summarise it"""
+    for stub in stubs.values():
+        stub.reset()
+    start = time.perf_counter()
+    recorder = run()
+    duration = time.perf_counter() - start
+
+    requests_made = len(recorder.latencies)
+    upstream_calls = {upstream: stub.calls for upstream, stub in stubs.items()}
+    total_upstream = sum(upstream_calls.values())
+    return {
+        'scenario': name,
+        'client_requests': requests_made,
+        'errors': recorder.errors,
+        'duration_s': round(duration, 4),
+        'throughput_rps': round(requests_made / duration, 2) if duration else None,
+        'latency_ms': {
+            'p50': round(percentile(recorder.latencies, 50) * 1000, 3) if requests_made else None,
+            'p99': round(percentile(recorder.latencies, 99) * 1000, 3) if requests_made else None,
+            'max': round(max(recorder.latencies) * 1000, 3) if requests_made else None,
+        },
+        'upstream_calls': upstream_calls,
+        'upstream_calls_per_request': round(total_upstream / requests_made, 3) if requests_made else None,
+    }
+
+
+def compare(report, baseline):
+    """Print the change of each scenario's headline numbers against a baseline report"""
+    previous = {s['scenario']: s for s in baseline.get('scenarios', [])}
+    for scenario in report['scenarios']:
+        before = previous.get(scenario['scenario'])
+        if not before:
+            continue
+        rows = [
+            ('throughput_rps', before['throughput_rps'], scenario['throughput_rps']),
+            ('p50_ms', before['latency_ms']['p50'], scenario['latency_ms']['p50']),
+            ('p99_ms', before['latency_ms']['p99'], scenario['latency_ms']['p99']),
+            ('upstream_calls_per_request', before['upstream_calls_per_request'], scenario['upstream_calls_per_request']),
+        ]
+        for metric, old, new in rows:
+            if old in (None, 0) or new is None:
+                continue
+            change = (new - old) / old * 100
+            print(f"{scenario['scenario']:>5} {metric:<27} {old:>10} -> {new:<10} ({change:+.1f}%)", file=sys.stderr)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--scenarios', default='poll,chat', help='Comma-separated scenarios to run (poll, chat)')
+    parser.add_argument('--tabs', type=int, default=4, help='Browser tabs polling prices')
+    parser.add_argument('--rounds', type=int, default=3, help='Polling rounds per tab')
+    parser.add_argument('--interval', type=float, default=5.0, help='Seconds between polling rounds (frontend uses 5)')
+    parser.add_argument('--bursts', type=int, default=3, help='Number of chat bursts')
+    parser.add_argument('--burst-size', type=int, default=5, help='Concurrent chat requests per burst')
+    parser.add_argument('--burst-pause', type=float, default=1.0, help='Seconds between chat bursts')
+    parser.add_argument('--coinbase-latency', type=float, default=0.05, help='Injected Coinbase latency (s)')
+    parser.add_argument('--coinbase-error-rate', type=float, default=0.0, help='Fraction of Coinbase calls that fail')
+    parser.add_argument('--gemini-latency', type=float, default=0.5, help='Injected Gemini latency (s)')
+    parser.add_argument('--gemini-error-rate', type=float, default=0.0, help='Fraction of Gemini calls that fail')
+    parser.add_argument('--seed', type=int, default=0, help='Seed for error injection')
+    parser.add_argument('--output', help='Write the JSON report to this file instead of stdout')
+    parser.add_argument('--baseline', help='Earlier JSON report to compare against')
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+
+    stubs = {
+        'coinbase': CoinbaseStub(args.coinbase_latency, args.coinbase_error_rate, args.seed).start(),
+        'gemini': GeminiStub(args.gemini_latency, args.gemini_error_rate, args.seed).start(),
+    }
+    configure_environment(stubs['coinbase'], stubs['gemini'])
+    server, base_url = start_app()
+
+    scenarios = {
+        'poll': lambda: run_poll(base_url, args.tabs, args.rounds, args.interval),
+        'chat': lambda: run_chat(base_url, args.bursts, args.burst_size, args.burst_pause),
+    }
+
+    try:
+        results = [
+            measure(name, scenarios[name], stubs)
+            for name in args.scenarios.split(',')
+        ]
+    finally:
+        server.shutdown()
+        for stub in stubs.values():
+            stub.stop()
+
+    report = {
+        'commit': git_commit(),
+        'timestamp': int(time.time()),
+        'python': platform.python_version(),
+        'config': vars(args),
+        'scenarios': results,
+    }
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(output + '\n')
+    else:
+        print(output)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            compare(report, json.load(f))
+
+
+if __name__ == '__main__':
+    main()
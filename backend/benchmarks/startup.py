@@ -0,0 +1,137 @@
+"""
+Import-time / cold-start benchmark for the backend
+
+Imports the app in fresh interpreters for each GEMINI_IMPORT_MODE and reports
+how long startup takes, how long the deferred Gemini SDK import takes on first
+use, and which packages dominate import time (python -X importtime).
+
+Run from the backend directory:
+    python -m benchmarks.startup
+    python -m benchmarks.startup --runs 10 --output before.json
+    python -m benchmarks.startup --output after.json --baseline before.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+
+from benchmarks.load_test import git_commit
+
+# Runs in a child interpreter; prints the timings as JSON
+PROBE = """
+import json, time
+start = time.perf_counter()
+import app
+import_app = time.perf_counter() - start
+from api import llm
+start = time.perf_counter()
+llm.load_sdk()
+first_llm_import = time.perf_counter() - start
+print(json.dumps({'import_app_s': import_app, 'first_llm_sdk_import_s': first_llm_import}))
+"""
+
+
+def probe(mode):
+    """Time one cold import of the app in a new interpreter"""
+    env = dict(os.environ, GEMINI_IMPORT_MODE=mode)
+    env.pop('PROMETHEUS_MULTIPROC_DIR', None)
+    start = time.perf_counter()
+    output = subprocess.check_output([sys.executable, '-c', PROBE], env=env, text=True, stderr=subprocess.DEVNULL)
+    wall = time.perf_counter() - start
+    timings = json.loads(output.strip().splitlines()[-1])
+    timings['process_wall_s'] = wall
+    return timings
+
+
+def top_imports(mode, limit):
+    """Packages that spend the most time importing, by summed self time in milliseconds"""
+    env = dict(os.environ, GEMINI_IMPORT_MODE=mode)
+    env.pop('PROMETHEUS_MULTIPROC_DIR', None)
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', 'import app'],
+        env=env, capture_output=True, text=True, check=True,
+    )
+    packages = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:'):
+            continue
+        parts = [p.strip() for p in line[len('import time:'):].split('|')]
+        if len(parts) != 3 or not parts[0].isdigit():
+            continue
+        # Self times never overlap, so summing them per root package is exact
+        root = parts[2].split('.')[0]
+        packages[root] = packages.get(root, 0) + int(parts[0])
+    ranked = sorted(packages.items(), key=lambda item: item[1], reverse=True)[:limit]
+    return [{'package': name, 'self_ms': round(us / 1000, 2)} for name, us in ranked]
+
+
+def summarise(mode, runs, limit):
+    samples = [probe(mode) for _ in range(runs)]
+
+    def median_ms(field):
+        return round(statistics.median(s[field] for s in samples) * 1000, 2)
+
+    return {
+        'mode': mode,
+        'runs': runs,
+        'import_app_ms': median_ms('import_app_s'),
+        'first_llm_sdk_import_ms': median_ms('first_llm_sdk_import_s'),
+        'process_wall_ms': median_ms('process_wall_s'),
+        'top_imports': top_imports(mode, limit),
+    }
+
+
+def compare(report, baseline):
+    """Print the change in median startup numbers against a baseline report"""
+    previous = {m['mode']: m for m in baseline.get('modes', [])}
+    for mode in report['modes']:
+        before = previous.get(mode['mode'])
+        if not before:
+            continue
+        for metric in ('import_app_ms', 'first_llm_sdk_import_ms', 'process_wall_ms'):
+            old, new = before[metric], mode[metric]
+            if not old:
+                continue
+            change = (new - old) / old * 100
+            print(f"{mode['mode']:>10} {metric:<24} {old:>10} -> {new:<10} ({change:+.1f}%)", file=sys.stderr)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--modes', default='lazy,eager', help='Comma-separated GEMINI_IMPORT_MODE values to measure')
+    parser.add_argument('--runs', type=int, default=5, help='Cold starts per mode (median is reported)')
+    parser.add_argument('--top', type=int, default=10, help='Number of slowest packages to list')
+    parser.add_argument('--output', help='Write the JSON report to this file instead of stdout')
+    parser.add_argument('--baseline', help='Earlier JSON report to compare against')
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    report = {
+        'commit': git_commit(),
+        'timestamp': int(time.time()),
+        'python': platform.python_version(),
+        'config': vars(args),
+        'modes': [summarise(mode, args.runs, args.top) for mode in args.modes.split(',')],
+    }
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(output + '\n')
+    else:
+        print(output)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            compare(report, json.load(f))
+
+
+if __name__ == '__main__':
+    main()
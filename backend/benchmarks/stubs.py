@@ -0,0 +1,173 @@
+"""
+Local stand-ins for the Coinbase candles API and the Gemini REST API
+
+Each stub runs an HTTP server on a background thread, counts the calls it
+receives and can inject latency and errors so the backend can be measured
+without touching the real upstreams.
+"""
+
+import json
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+GRANULARITY_SECONDS = {
+    'ONE_MINUTE': 60,
+    'FIVE_MINUTE': 300,
+    'FIFTEEN_MINUTE': 900,
+    'THIRTY_MINUTE': 1800,
+    'ONE_HOUR': 3600,
+    'TWO_HOUR': 7200,
+    'SIX_HOUR': 21600,
+    'ONE_DAY': 86400,
+}
+
+# Coinbase returns at most 350 candles per request
+MAX_CANDLES = 350
+
+CANDLES_PATH = re.compile(r'^/api/v3/brokerage/products/(?P<ticker>[^/]+)/candles$')
+GENERATE_PATH = re.compile(r'^/v1beta/models/(?P<model>[^/:]+):generateContent$')
+
+CHAT_RESPONSE = {
+    'research': 'Bitcoin is the OG [Source: CoinMarketCap].',
+    'is_plan': True,
+    'plans': [
+        {'action': 'buy', 'crypto': 'BTC', 'amount': 1, 'reason': 'It is the benchmark coin.'},
+    ],
+}
+
+
+class StubServer:
+    """
+    Threaded HTTP stub with latency and error injection
+
+    Args:
+        latency: Seconds to sleep before answering each request
+        error_rate: Fraction of requests (0.0 - 1.0) answered with HTTP 500
+        seed: Seed for the error injection RNG so runs are repeatable
+    """
+
+    def __init__(self, latency=0.0, error_rate=0.0, seed=0):
+        self.latency = latency
+        self.error_rate = error_rate
+        self.calls = 0
+        self.errors = 0
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(('127.0.0.1', 0), self._handler_class())
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    @property
+    def url(self):
+        host, port = self._server.server_address
+        return f"http://{host}:{port}"
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def reset(self):
+        with self._lock:
+            self.calls = 0
+            self.errors = 0
+
+    def _should_fail(self):
+        with self._lock:
+            self.calls += 1
+            fail = self._random.random() < self.error_rate
+            if fail:
+                self.errors += 1
+            return fail
+
+    def handle(self, method, path, query, body):
+        """Return (status, payload) for a request; implemented by subclasses"""
+        raise NotImplementedError
+
+    def _handler_class(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def _respond(self):
+                length = int(self.headers.get('Content-Length') or 0)
+                body = self.rfile.read(length) if length else b''
+                parsed = urlparse(self.path)
+
+                if stub.latency:
+                    time.sleep(stub.latency)
+
+                if stub._should_fail():
+                    status, payload = 500, {'error': 'injected failure'}
+                else:
+                    status, payload = stub.handle(self.command, parsed.path, parse_qs(parsed.query), body)
+
+                data = json.dumps(payload).encode('utf-8')
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            do_GET = _respond
+            do_POST = _respond
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+
+class CoinbaseStub(StubServer):
+    """Serves /api/v3/brokerage/products/<ticker>/candles with deterministic candles"""
+
+    def handle(self, method, path, query, body):
+        match = CANDLES_PATH.match(path)
+        if method != 'GET' or not match:
+            return 404, {'error': 'NOT_FOUND'}
+
+        start = int(query.get('start', ['0'])[0])
+        end = int(query.get('end', ['0'])[0])
+        step = GRANULARITY_SECONDS.get(query.get('granularity', ['ONE_DAY'])[0], 86400)
+        count = max(0, min(MAX_CANDLES, (end - start) // step))
+
+        # Coinbase returns the newest candle first, with every field as a string
+        base = 100.0 + sum(map(ord, match.group('ticker'))) % 1000
+        candles = []
+        for i in range(count):
+            ts = end - end % step - i * step
+            close = base * (1 + 0.01 * ((ts // step) % 7 - 3))
+            candles.append({
+                'start': str(ts),
+                'low': f"{close * 0.98:.2f}",
+                'high': f"{close * 1.02:.2f}",
+                'open': f"{close * 0.99:.2f}",
+                'close': f"{close:.2f}",
+                'volume': f"{1000 + i * 3.5:.8f}",
+            })
+        return 200, {'candles': candles}
+
+
+class GeminiStub(StubServer):
+    """Serves the Gemini REST generateContent call with a canned Coinpilot JSON answer"""
+
+    def handle(self, method, path, query, body):
+        if method != 'POST' or not GENERATE_PATH.match(path):
+            return 404, {'error': {'code': 404, 'message': 'Not found'}}
+
+        text = '```json\n' + json.dumps(CHAT_RESPONSE) + '\n```'
+        return 200, {
+            'candidates': [{
+                'content': {'role': 'model', 'parts': [{'text': text}]},
+                'finishReason': 'STOP',
+                'index': 0,
+            }],
+        }
@@ -0,0 +1,45 @@
+"""
+Gunicorn configuration
+
+Picked up automatically when gunicorn is started from the backend directory:
+    gunicorn app:app
+"""
+
+import os
+import shutil
+import tempfile
+
+bind = f"0.0.0.0:{os.getenv('PORT', 4000)}"
+workers = int(os.getenv('WEB_CONCURRENCY', 2))
+
+# Import the app once in the master so workers share parsed keys and module state
+# copy-on-write instead of each repeating the imports. The Gemini SDK (gRPC) is not
+# fork-safe, so with GEMINI_IMPORT_MODE=eager the app sees GUNICORN_PRELOAD_APP and
+# moves the SDK import into each worker's post_fork.
+preload_app = os.getenv('GUNICORN_PRELOAD', '1') == '1'
+if preload_app:
+    os.environ['GUNICORN_PRELOAD_APP'] = '1'
+
+# Each worker writes its metrics into this directory so /metrics can sum them.
+# Must be set (and emptied) before prometheus_client is imported by the app, which
+# with preload_app happens before gunicorn's on_starting hook runs.
+os.environ.setdefault(
+    'PROMETHEUS_MULTIPROC_DIR',
+    os.path.join(tempfile.gettempdir(), 'coinpilot-prometheus'),
+)
+shutil.rmtree(os.environ['PROMETHEUS_MULTIPROC_DIR'], ignore_errors=True)
+os.makedirs(os.environ['PROMETHEUS_MULTIPROC_DIR'], exist_ok=True)
+
+
+def post_fork(server, worker):
+    """Start per-worker work after forking: SDK warm-up (eager mode blocks here) and portfolio snapshots"""
+    from api import startup
+    from api.portfolio_history import start_scheduler
+    startup.start_warm_up()
+    start_scheduler()
+
+
+def child_exit(server, worker):
+    """Drop live gauges of workers that have exited"""
+    from prometheus_client import multiprocess
+    multiprocess.mark_process_dead(worker.pid)
@@ -0,0 +1,141 @@
+"""
+Tests for the /api/historical-prices endpoint against the local Coinbase stub
+Run from the backend directory: python -m pytest test_historical_prices_api.py
+
+(test_historical_prices.py is a manual script that needs a running server.)
+"""
+
+import gzip
+
+import pytest
+from cryptography.hazmat.primitives.asymmetric import ec
+
+import api.getData as getData
+from api.candle_store import candle_store
+from app import app
+from benchmarks.stubs import CoinbaseStub
+
+URL = '/api/historical-prices/BTC-USD'
+
+@pytest.fixture(scope='module')
+def coinbase():
+    stub = CoinbaseStub().start()
+    yield stub
+    stub.stop()
+
+@pytest.fixture
+def client(coinbase, monkeypatch):
+    # Point fetch_candles at the stub with a throwaway signing key
+    monkeypatch.setattr(getData, 'api_base_url', coinbase.url)
+    monkeypatch.setattr(getData, 'key_name', 'organizations/test/apiKeys/test')
+    monkeypatch.setattr(getData, '_private_key', ec.generate_private_key(ec.SECP256R1()))
+    # Every test starts from an empty store that keeps series for the whole test
+    monkeypatch.setattr(candle_store, 'ttl', 60)
+    monkeypatch.setattr(candle_store, '_series', {})
+    coinbase.reset()
+    return app.test_client()
+
+def get(client, query='', **headers):
+    # The test client sends no Accept-Encoding unless asked, so bodies are identity
+    return client.get(URL + query, headers=headers)
+
+def test_compact_format_has_parallel_numeric_arrays(client):
+    raw = get(client, '?days_back=5').get_json()
+    compact = get(client, '?days_back=5&format=compact').get_json()
+
+    candles = raw['data']['candles']
+    data = compact['data']
+    assert compact['format'] == 'compact'
+    assert set(data) == {'t', 'o', 'h', 'l', 'c', 'v'}
+    assert all(len(values) == len(candles) for values in data.values())
+    assert data['t'] == [int(c['start']) for c in candles]
+    assert data['c'] == [float(c['close']) for c in candles]
+
+def test_unknown_format_is_rejected(client, coinbase):
+    response = get(client, '?format=csv')
+
+    assert response.status_code == 400
+    assert response.get_json()['success'] is False
+    assert coinbase.calls == 0
+
+def test_matching_etag_gets_304(client, coinbase):
+    first = get(client, '?format=compact')
+
+    again = get(client, '?format=compact', **{'If-None-Match': first.headers['ETag']})
+
+    assert first.status_code == 200
+    assert first.headers['ETag'].startswith('W/')
+    assert again.status_code == 304
+    assert again.data == b''
+    assert again.headers['ETag'] == first.headers['ETag']
+    assert coinbase.calls == 1
+
+def test_if_modified_since_gets_304(client):
+    first = get(client)
+
+    again = get(client, **{'If-Modified-Since': first.headers['Last-Modified']})
+
+    assert again.status_code == 304
+
+def test_etag_of_other_format_gets_full_response(client):
+    compact = get(client, '?format=compact')
+
+    raw = get(client, **{'If-None-Match': compact.headers['ETag']})
+
+    assert raw.status_code == 200
+    assert raw.headers['ETag'] != compact.headers['ETag']
+    assert 'candles' in raw.get_json()['data']
+
+def test_if_none_match_takes_precedence_over_if_modified_since(client):
+    first = get(client)
+
+    # A current Last-Modified would give a 304 on its own, but the ETag does not match
+    response = get(client, **{
+        'If-None-Match': 'W/"stale-raw"',
+        'If-Modified-Since': first.headers['Last-Modified'],
+    })
+
+    assert response.status_code == 200
+
+def test_gzip_negotiation(client):
+    plain = get(client)
+    compressed = get(client, **{'Accept-Encoding': 'gzip'})
+
+    assert 'Content-Encoding' not in plain.headers
+    assert compressed.headers['Content-Encoding'] == 'gzip'
+    assert 'Accept-Encoding' in compressed.headers['Vary']
+    assert gzip.decompress(compressed.data) == plain.data
+
+def test_brotli_falls_back_to_gzip_when_unavailable(client, monkeypatch):
+    monkeypatch.setattr(getData, 'brotli', None)
+
+    response = get(client, **{'Accept-Encoding': 'br, gzip'})
+
+    assert response.headers['Content-Encoding'] == 'gzip'
+
+def test_small_body_is_not_compressed(client):
+    # No candles in a zero-day window, so the body is far below MIN_COMPRESS_SIZE
+    response = get(client, '?days_back=0', **{'Accept-Encoding': 'gzip'})
+
+    assert len(response.data) < getData.MIN_COMPRESS_SIZE
+    assert 'Content-Encoding' not in response.headers
+    assert response.get_json()['data'] == {'candles': []}
+
+def test_body_is_serialized_once_across_encodings(client, coinbase, monkeypatch):
+    dumps = app.json.dumps
+    calls = []
+
+    def counting_dumps(obj, **kwargs):
+        calls.append(obj)
+        return dumps(obj, **kwargs)
+
+    monkeypatch.setattr(app.json, 'dumps', counting_dumps)
+
+    compressed = get(client, **{'Accept-Encoding': 'gzip'})
+    plain = get(client)
+    compressed_again = get(client, **{'Accept-Encoding': 'gzip'})
+
+    assert len(calls) == 1
+    assert coinbase.calls == 1
+    assert gzip.decompress(compressed.data) == plain.data
+    assert compressed_again.data == compressed.data
@@ -0,0 +1,130 @@
+"""
+Tests for the portfolio value time series store
+Run from the backend directory: python -m pytest test_portfolio_store.py
+"""
+
+import pytest
+
+from api.portfolio_store import RECORD, PortfolioStore
+
+# Small tiers keep the numbers readable: 10s for 100s, 100s for 1000s, 1000s forever
+TIERS = [(10, 100), (100, 1000), (1000, None)]
+
+class FakeClock:
+    """Injected clock so tier selection does not depend on the real time"""
+
+    def __init__(self, now):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+@pytest.fixture
+def clock():
+    return FakeClock(2000)
+
+@pytest.fixture
+def store(tmp_path, clock):
+    return PortfolioStore(str(tmp_path), tiers=TIERS, clock=clock)
+
+def read_tier(store, bucket, user_id='u'):
+    return store._read(store._path(user_id, bucket))
+
+def test_same_bucket_overwrites_instead_of_appending(store):
+    store.append('u', 1000, 1.0)
+    store.append('u', 1005, 2.0)
+
+    assert read_tier(store, 10) == ([1000], [2.0])
+
+    store.append('u', 1010, 3.0)
+
+    assert read_tier(store, 10) == ([1000, 1010], [2.0, 3.0])
+    # Coarser tiers hold one point per bucket with the latest value
+    assert read_tier(store, 100) == ([1000], [3.0])
+    assert read_tier(store, 1000) == ([1000], [3.0])
+
+def test_out_of_order_point_is_dropped(store):
+    store.append('u', 1000, 1.0)
+    store.append('u', 800, 2.0)
+    store.append('u', 1050, 3.0)
+
+    # 800 is older than every tier's last bucket, so it never lands on disk
+    assert read_tier(store, 10) == ([1000, 1050], [1.0, 3.0])
+    assert read_tier(store, 100) == ([1000], [3.0])
+    assert read_tier(store, 1000) == ([1000], [3.0])
+    assert store.query('u', 0, 2000)['t'] == [1000]
+
+def test_compaction_drops_only_points_past_retention(store):
+    for ts in range(0, 200, 10):
+        store.append('u', ts, float(ts))
+    store.append('u', 250, 250.0)
+
+    # Cutoff is 250 - 100: everything at or after 150 survives in the 10s tier
+    assert read_tier(store, 10)[0] == [150, 160, 170, 180, 190, 250]
+    # Tiers with longer or no retention keep all of their buckets
+    assert read_tier(store, 100)[0] == [0, 100, 200]
+    assert read_tier(store, 1000)[0] == [0]
+
+def test_trailing_partial_record_is_ignored_and_replaced(store):
+    store.append('u', 1000, 1.0)
+    with open(store._path('u', 10), 'ab') as f:
+        f.write(b'\x00' * (RECORD.size // 2))
+
+    assert read_tier(store, 10) == ([1000], [1.0])
+
+    store.append('u', 1010, 2.0)
+
+    assert read_tier(store, 10) == ([1000, 1010], [1.0, 2.0])
+
+@pytest.mark.parametrize('start, resolution', [
+    (1950, 10),     # within the 10s tier's 100s retention
+    (1500, 100),    # within the 100s tier's 1000s retention
+    (0, 1000),      # only the unlimited tier reaches back this far
+])
+def test_query_picks_finest_tier_covering_start(store, start, resolution):
+    for ts in range(0, 2001, 10):
+        store.append('u', ts, float(ts))
+
+    result = store.query('u', start, 2000)
+
+    assert result['resolution'] == resolution
+    assert result['t'] == sorted(result['t'])
+    assert all(start <= ts <= 2000 for ts in result['t'])
+
+def test_query_thinning_keeps_newest_point(store):
+    for ts in range(1900, 2001, 10):
+        store.append('u', ts, float(ts))
+
+    result = store.query('u', 1950, 2000, max_points=3)
+
+    assert result['t'] == [1950, 1970, 2000]
+    assert result['v'] == [1950.0, 1970.0, 2000.0]
+
+    result = store.query('u', 1950, 2000, max_points=1)
+
+    assert result['t'] == [2000]
+
+def test_value_at_allows_two_buckets_of_tolerance(store):
+    store.append('u', 1900, 42.0)
+
+    assert store.value_at('u', 1900) == 42.0
+    assert store.value_at('u', 1920) == 42.0
+    assert store.value_at('u', 1921) is None
+    assert store.value_at('u', 1899) is None
+
+def test_value_at_uses_coarser_tier_outside_retention(store, clock):
+    store.append('u', 1900, 42.0)
+    clock.now = 2500
+
+    # 1900 is past the 10s tier's retention, so the 100s tier (tolerance 200s) answers
+    assert store.value_at('u', 2050) == 42.0
+    assert store.value_at('u', 2101) is None
+
+def test_latest_and_unknown_user(store):
+    assert store.latest('u') is None
+    assert store.query('u', 0, 2000)['t'] == []
+
+    store.append('u', 1000, 1.0)
+    store.append('u', 1010, 2.0)
+
+    assert store.latest('u') == (1010, 2.0)